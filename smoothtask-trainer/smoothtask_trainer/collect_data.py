@@ -3,17 +3,233 @@
 from __future__ import annotations
 
 import gzip
+import io
 import json
 import sqlite3
 import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable, List, Optional, Union
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 
 import pandas as pd
 from tqdm import tqdm
 
 from .dataset import load_snapshots_as_frame
 
+try:
+    # orjson (необязательная зависимость) кодирует и разбирает JSON в несколько раз быстрее
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_loads(line: str) -> object:
+    """
+    Разбирает JSON-строку через orjson, если он установлен, иначе через json.
+
+    orjson не принимает токены NaN/Infinity, которые пишет json.dumps по
+    умолчанию, поэтому такие строки повторно разбираются стандартным json.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(line)
+
+
+def _json_dumps(value: object) -> str:
+    """Сериализует список (tags, process_ids) в JSON-строку для хранения в SQLite."""
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value)
+
+
+# Размер буфера чтения файлов снапшотов (по умолчанию Python читает по 8 КБ)
+_READ_BUFFER_SIZE = 128 * 1024
+
+
+# Настройки соединения для массовой загрузки, безопасные для любой базы
+_BULK_LOAD_PRAGMAS = """
+PRAGMA temp_store = MEMORY;
+PRAGMA cache_size = -262144;
+PRAGMA locking_mode = EXCLUSIVE;
+"""
+
+# Настройки только для новой (несуществующей или пустой) базы: журнал в памяти
+# и без fsync. При сбое теряется лишь частично собранная новая база; в
+# существующую базу collect_data дописывает данные, и её защищает обычный
+# журнал отката. page_size действует только на новой базе и выполняется до
+# CREATE TABLE.
+_NEW_DB_PRAGMAS = """
+PRAGMA page_size = 65536;
+PRAGMA journal_mode = MEMORY;
+PRAGMA synchronous = OFF;
+"""
+
+# Схема базы снапшотов: создаётся одним executescript. processes и app_groups
+# объявлены WITHOUT ROWID: строки хранятся прямо в B-дереве составного ключа,
+# без отдельного индекса первичного ключа.
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot_id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    cpu_user REAL,
+    cpu_system REAL,
+    cpu_idle REAL,
+    cpu_iowait REAL,
+    mem_total_kb INTEGER,
+    mem_used_kb INTEGER,
+    mem_available_kb INTEGER,
+    swap_total_kb INTEGER,
+    swap_used_kb INTEGER,
+    load_avg_one REAL,
+    load_avg_five REAL,
+    load_avg_fifteen REAL,
+    psi_cpu_some_avg10 REAL,
+    psi_cpu_some_avg60 REAL,
+    psi_io_some_avg10 REAL,
+    psi_mem_some_avg10 REAL,
+    psi_mem_full_avg10 REAL,
+    user_active INTEGER,
+    time_since_last_input_ms INTEGER,
+    sched_latency_p95_ms REAL,
+    sched_latency_p99_ms REAL,
+    audio_xruns_delta INTEGER,
+    ui_loop_p95_ms REAL,
+    frame_jank_ratio REAL,
+    bad_responsiveness INTEGER,
+    responsiveness_score REAL
+);
+
+CREATE TABLE IF NOT EXISTS processes (
+    snapshot_id INTEGER NOT NULL,
+    pid INTEGER NOT NULL,
+    ppid INTEGER,
+    uid INTEGER,
+    gid INTEGER,
+    exe TEXT,
+    cmdline TEXT,
+    cgroup_path TEXT,
+    systemd_unit TEXT,
+    app_group_id TEXT,
+    state TEXT,
+    start_time INTEGER,
+    uptime_sec INTEGER,
+    tty_nr INTEGER,
+    has_tty INTEGER,
+    cpu_share_1s REAL,
+    cpu_share_10s REAL,
+    io_read_bytes INTEGER,
+    io_write_bytes INTEGER,
+    rss_mb INTEGER,
+    swap_mb INTEGER,
+    voluntary_ctx INTEGER,
+    involuntary_ctx INTEGER,
+    has_gui_window INTEGER,
+    is_focused_window INTEGER,
+    window_state TEXT,
+    env_has_display INTEGER,
+    env_has_wayland INTEGER,
+    env_term TEXT,
+    env_ssh INTEGER,
+    is_audio_client INTEGER,
+    has_active_stream INTEGER,
+    process_type TEXT,
+    tags TEXT,
+    nice INTEGER,
+    ionice_class INTEGER,
+    ionice_prio INTEGER,
+    teacher_priority_class TEXT,
+    teacher_score REAL,
+    PRIMARY KEY (snapshot_id, pid)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS app_groups (
+    snapshot_id INTEGER NOT NULL,
+    app_group_id TEXT NOT NULL,
+    root_pid INTEGER,
+    process_ids TEXT,
+    app_name TEXT,
+    total_cpu_share REAL,
+    total_io_read_bytes INTEGER,
+    total_io_write_bytes INTEGER,
+    total_rss_mb INTEGER,
+    has_gui_window INTEGER,
+    is_focused_group INTEGER,
+    tags TEXT,
+    priority_class TEXT,
+    PRIMARY KEY (snapshot_id, app_group_id)
+) WITHOUT ROWID;
+"""
+
+
+# Порядок столбцов совпадает с _SCHEMA_SQL. Строки вставляются кортежами в этом
+# порядке: отсутствующие в снапшоте поля становятся NULL, лишние игнорируются.
+_SNAPSHOT_COLUMNS = (
+    "snapshot_id", "timestamp", "cpu_user", "cpu_system", "cpu_idle", "cpu_iowait",
+    "mem_total_kb", "mem_used_kb", "mem_available_kb", "swap_total_kb", "swap_used_kb",
+    "load_avg_one", "load_avg_five", "load_avg_fifteen", "psi_cpu_some_avg10",
+    "psi_cpu_some_avg60", "psi_io_some_avg10", "psi_mem_some_avg10",
+    "psi_mem_full_avg10", "user_active", "time_since_last_input_ms",
+    "sched_latency_p95_ms", "sched_latency_p99_ms", "audio_xruns_delta",
+    "ui_loop_p95_ms", "frame_jank_ratio", "bad_responsiveness", "responsiveness_score",
+)
+
+_PROCESS_COLUMNS = (
+    "snapshot_id", "pid", "ppid", "uid", "gid", "exe", "cmdline", "cgroup_path",
+    "systemd_unit", "app_group_id", "state", "start_time", "uptime_sec", "tty_nr",
+    "has_tty", "cpu_share_1s", "cpu_share_10s", "io_read_bytes", "io_write_bytes",
+    "rss_mb", "swap_mb", "voluntary_ctx", "involuntary_ctx", "has_gui_window",
+    "is_focused_window", "window_state", "env_has_display", "env_has_wayland",
+    "env_term", "env_ssh", "is_audio_client", "has_active_stream", "process_type",
+    "tags", "nice", "ionice_class", "ionice_prio", "teacher_priority_class",
+    "teacher_score",
+)
+
+_APP_GROUP_COLUMNS = (
+    "snapshot_id", "app_group_id", "root_pid", "process_ids", "app_name",
+    "total_cpu_share", "total_io_read_bytes", "total_io_write_bytes", "total_rss_mb",
+    "has_gui_window", "is_focused_group", "tags", "priority_class",
+)
+
+
+def _build_insert_sql(table: str, columns: Tuple[str, ...]) -> str:
+    """Формирует INSERT OR REPLACE для таблицы с фиксированным списком столбцов."""
+    placeholders = ", ".join("?" * len(columns))
+    return f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+
+_INSERT_SNAPSHOT_SQL = _build_insert_sql("snapshots", _SNAPSHOT_COLUMNS)
+_INSERT_PROCESS_SQL = _build_insert_sql("processes", _PROCESS_COLUMNS)
+_INSERT_APP_GROUP_SQL = _build_insert_sql("app_groups", _APP_GROUP_COLUMNS)
+
+# Поля-списки, которые хранятся в SQLite как JSON-строки (индексы в кортеже строки)
+_PROCESS_JSON_INDICES = (_PROCESS_COLUMNS.index("tags"),)
+_APP_GROUP_JSON_INDICES = (
+    _APP_GROUP_COLUMNS.index("tags"),
+    _APP_GROUP_COLUMNS.index("process_ids"),
+)
+
+
+def _open_snapshot_file(snapshot_file: Path) -> TextIO:
+    """
+    Открывает файл снапшотов (JSONL или JSONL.gz) для построчного чтения.
+
+    Args:
+        snapshot_file: Путь к файлу снапшотов
+
+    Returns:
+        Текстовый поток в UTF-8 с буфером чтения _READ_BUFFER_SIZE
+    """
+    if snapshot_file.suffix == ".gz":
+        raw = io.BufferedReader(
+            gzip.open(snapshot_file, "rb"), buffer_size=_READ_BUFFER_SIZE
+        )
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return open(snapshot_file, "r", encoding="utf-8", buffering=_READ_BUFFER_SIZE)
+
 
 def _parse_snapshot_line(line: str) -> dict:
     """
@@ -29,284 +245,328 @@ def _parse_snapshot_line(line: str) -> dict:
         ValueError: если строка не является валидным JSON
     """
     try:
-        return json.loads(line)
+        return _json_loads(line)
     except json.JSONDecodeError as exc:
         raise ValueError(f"Некорректный JSON в строке снапшота: {exc}") from exc
 
 
+def _make_row(
+    data: dict,
+    columns: Tuple[str, ...],
+    snapshot_id: object,
+    json_indices: Tuple[int, ...],
+) -> tuple:
+    """
+    Собирает строку для вставки из словаря процесса или группы.
+
+    Args:
+        data: Словарь с данными процесса или группы
+        columns: Столбцы таблицы (первый - snapshot_id)
+        snapshot_id: Идентификатор снапшота, если в data его нет
+        json_indices: Индексы полей-списков, сериализуемых в JSON
+
+    Returns:
+        Кортеж значений в порядке columns
+    """
+    row = [data.get("snapshot_id", snapshot_id)]
+    row.extend(map(data.get, columns[1:]))
+    for idx in json_indices:
+        # Конвертируем списки в JSON строки для совместимости с SQLite
+        if isinstance(row[idx], list):
+            row[idx] = _json_dumps(row[idx])
+    return tuple(row)
+
+
 def _extract_snapshot_data(snapshot: dict) -> dict:
     """
     Извлекает данные из структуры снапшота и нормализует их.
     
+    Строки сразу собираются кортежами в порядке столбцов таблиц
+    (_SNAPSHOT_COLUMNS, _PROCESS_COLUMNS, _APP_GROUP_COLUMNS), без
+    промежуточных словарей. Исходный словарь не изменяется.
+    
     Args:
         snapshot: Словарь с данными снапшота
         
     Returns:
-        Нормализованный словарь с данными для DataFrame
+        Словарь с ключами "snapshot" (кортеж), "processes" и "app_groups"
+        (списки кортежей), готовыми для executemany
     """
-    # Извлекаем основные данные снапшота
-    snapshot_data = {
-        "snapshot_id": snapshot.get("snapshot_id", 0),
-        "timestamp": snapshot.get("timestamp", ""),
-        **{f"{key}": value for key, value in snapshot.items() 
-           if key not in ["snapshot_id", "timestamp", "processes", "app_groups"]}
-    }
-    
-    # Извлекаем процессы
-    processes = []
-    for proc in snapshot.get("processes", []):
-        process_data = {
-            "snapshot_id": snapshot_data["snapshot_id"],
-            **proc
-        }
-        # Конвертируем списки в JSON строки для совместимости с SQLite
-        if "tags" in process_data and isinstance(process_data["tags"], list):
-            process_data["tags"] = json.dumps(process_data["tags"])
-        processes.append(process_data)
+    snapshot_id = snapshot.get("snapshot_id", 0)
+    # _SNAPSHOT_COLUMNS начинается с snapshot_id и timestamp
+    snapshot_row = (
+        snapshot_id,
+        snapshot.get("timestamp", ""),
+        *map(snapshot.get, _SNAPSHOT_COLUMNS[2:]),
+    )
     
-    # Извлекаем группы приложений
-    app_groups = []
-    for group in snapshot.get("app_groups", []):
-        group_data = {
-            "snapshot_id": snapshot_data["snapshot_id"],
-            **group
-        }
-        # Конвертируем списки в JSON строки для совместимости с SQLite
-        if "tags" in group_data and isinstance(group_data["tags"], list):
-            group_data["tags"] = json.dumps(group_data["tags"])
-        if "process_ids" in group_data and isinstance(group_data["process_ids"], list):
-            group_data["process_ids"] = json.dumps(group_data["process_ids"])
-        app_groups.append(group_data)
+    processes = [
+        _make_row(proc, _PROCESS_COLUMNS, snapshot_id, _PROCESS_JSON_INDICES)
+        for proc in snapshot.get("processes") or []
+    ]
+    app_groups = [
+        _make_row(group, _APP_GROUP_COLUMNS, snapshot_id, _APP_GROUP_JSON_INDICES)
+        for group in snapshot.get("app_groups") or []
+    ]
     
     return {
-        "snapshot": snapshot_data,
+        "snapshot": snapshot_row,
         "processes": processes,
         "app_groups": app_groups
     }
 
 
+def _iter_snapshot_records(
+    snapshot_file: Path,
+) -> Iterator[Tuple[Optional[dict], Optional[str]]]:
+    """
+    Построчно разбирает файл снапшотов.
+
+    Args:
+        snapshot_file: Путь к файлу снапшотов
+
+    Yields:
+        Пары (извлечённые данные, None) для корректных строк и
+        (None, описание ошибки) для строк, которые не удалось разобрать
+    """
+    with _open_snapshot_file(snapshot_file) as f:
+        for line in f:
+            try:
+                yield _extract_snapshot_data(_parse_snapshot_line(line)), None
+            except Exception as e:
+                yield None, f"{snapshot_file.name}: {e}"
+
+
+def _decode_snapshot_file(
+    snapshot_file: Path,
+) -> Tuple[List[tuple], List[tuple], List[tuple], int, List[str]]:
+    """
+    Разбирает файл снапшотов целиком (выполняется в процессе-воркере).
+
+    Args:
+        snapshot_file: Путь к файлу снапшотов
+
+    Returns:
+        Кортеж (снапшоты, процессы, группы, число пропущенных строк,
+        до 5 примеров ошибок)
+    """
+    snapshots: List[tuple] = []
+    processes: List[tuple] = []
+    app_groups: List[tuple] = []
+    skipped_lines = 0
+    skipped_samples: List[str] = []
+
+    for extracted, error in _iter_snapshot_records(snapshot_file):
+        if error is not None:
+            skipped_lines += 1
+            if len(skipped_samples) < 5:
+                skipped_samples.append(error)
+            continue
+        snapshots.append(extracted["snapshot"])
+        processes.extend(extracted["processes"])
+        app_groups.extend(extracted["app_groups"])
+
+    return snapshots, processes, app_groups, skipped_lines, skipped_samples
+
+
+def _decode_files_in_pool(
+    executor: ProcessPoolExecutor, files: List[Path], window: int
+) -> Iterator[Tuple[List[tuple], List[tuple], List[tuple], int, List[str]]]:
+    """
+    Разбирает файлы в пуле процессов скользящим окном, сохраняя порядок файлов.
+    
+    В пуле одновременно находится не больше window задач: следующий файл
+    отправляется, только когда забран результат очередного. Первые window
+    задач отправляются сразу при вызове, а не при первой итерации.
+    
+    Args:
+        executor: Пул процессов
+        files: Пути к файлам снапшотов
+        window: Максимальное число задач в пуле
+        
+    Returns:
+        Итератор результатов _decode_snapshot_file в порядке files
+    """
+    pending = deque(
+        executor.submit(_decode_snapshot_file, snapshot_file)
+        for snapshot_file in files[:window]
+    )
+    remaining = iter(files[window:])
+    
+    def results() -> Iterator[Tuple[List[tuple], List[tuple], List[tuple], int, List[str]]]:
+        while pending:
+            result = pending.popleft().result()
+            next_file = next(remaining, None)
+            if next_file is not None:
+                pending.append(executor.submit(_decode_snapshot_file, next_file))
+            yield result
+    
+    return results()
+
+
 def _create_sqlite_from_snapshots(
     snapshot_files: Iterable[Path], 
     db_path: Path, 
-    chunk_size: int = 1000
+    chunk_size: int = 1000,
+    max_workers: Optional[int] = None
 ) -> None:
     """
     Создает SQLite базу данных из JSONL файлов снапшотов.
     
+    Файлы разбираются построчно в текущем процессе. Если max_workers больше 1,
+    разбор JSON выполняется параллельно в пуле процессов (по файлу на задачу),
+    а вставка в SQLite остаётся в текущем процессе. В этом режиме каждый файл
+    разбирается целиком: в худшем случае в памяти одновременно находятся
+    разобранные данные max_workers + 1 файлов (max_workers в пуле и один,
+    который сейчас вставляется), поэтому пиковая память растёт с размером
+    самых больших файлов, а не со всем объёмом загрузки.
+    
     Args:
         snapshot_files: Итератор с путями к файлам снапшотов
         db_path: Путь для сохранения SQLite базы данных
         chunk_size: Размер пакета для вставки данных
+        max_workers: Число процессов для разбора файлов (None или 1 - без пула)
         
     Raises:
         ValueError: если не удалось создать базу данных
     """
+    files = list(snapshot_files)
+    
+    executor: Optional[ProcessPoolExecutor] = None
+    if max_workers is not None and max_workers > 1:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    
+    conn: Optional[sqlite3.Connection] = None
     try:
-        conn = sqlite3.connect(db_path)
+        # Задачи отправляются в пул до открытия соединения: дочерние процессы
+        # (при старте через fork) не должны наследовать открытую базу SQLite.
+        # Порядок файлов сохраняется, поэтому при повторе snapshot_id
+        # результат тот же, что и при последовательном разборе
+        decoded: Optional[Iterator] = None
+        if executor is not None:
+            decoded = _decode_files_in_pool(executor, files, max_workers)
+        
+        # Транзакциями управляем явно: PRAGMA и DDL выполняются вне транзакции,
+        # а все вставки идут одной транзакцией BEGIN ... COMMIT
+        # Проверяем до connect(): sqlite3.connect создаёт пустой файл
+        is_new_db = not db_path.exists() or db_path.stat().st_size == 0
+        conn = sqlite3.connect(db_path, isolation_level=None)
         cursor = conn.cursor()
         
-        # Создаем таблицы
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS snapshots (
-                snapshot_id INTEGER PRIMARY KEY,
-                timestamp TEXT NOT NULL,
-                cpu_user REAL,
-                cpu_system REAL,
-                cpu_idle REAL,
-                cpu_iowait REAL,
-                mem_total_kb INTEGER,
-                mem_used_kb INTEGER,
-                mem_available_kb INTEGER,
-                swap_total_kb INTEGER,
-                swap_used_kb INTEGER,
-                load_avg_one REAL,
-                load_avg_five REAL,
-                load_avg_fifteen REAL,
-                psi_cpu_some_avg10 REAL,
-                psi_cpu_some_avg60 REAL,
-                psi_io_some_avg10 REAL,
-                psi_mem_some_avg10 REAL,
-                psi_mem_full_avg10 REAL,
-                user_active INTEGER,
-                time_since_last_input_ms INTEGER,
-                sched_latency_p95_ms REAL,
-                sched_latency_p99_ms REAL,
-                audio_xruns_delta INTEGER,
-                ui_loop_p95_ms REAL,
-                frame_jank_ratio REAL,
-                bad_responsiveness INTEGER,
-                responsiveness_score REAL
-            )
-            """
-        )
+        # Настраиваем соединение для массовой вставки и создаем таблицы
+        if is_new_db:
+            cursor.executescript(_NEW_DB_PRAGMAS)
+        cursor.executescript(_BULK_LOAD_PRAGMAS)
+        cursor.executescript(_SCHEMA_SQL)
+        cursor.execute("BEGIN")
         
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS processes (
-                snapshot_id INTEGER NOT NULL,
-                pid INTEGER NOT NULL,
-                ppid INTEGER,
-                uid INTEGER,
-                gid INTEGER,
-                exe TEXT,
-                cmdline TEXT,
-                cgroup_path TEXT,
-                systemd_unit TEXT,
-                app_group_id TEXT,
-                state TEXT,
-                start_time INTEGER,
-                uptime_sec INTEGER,
-                tty_nr INTEGER,
-                has_tty INTEGER,
-                cpu_share_1s REAL,
-                cpu_share_10s REAL,
-                io_read_bytes INTEGER,
-                io_write_bytes INTEGER,
-                rss_mb INTEGER,
-                swap_mb INTEGER,
-                voluntary_ctx INTEGER,
-                involuntary_ctx INTEGER,
-                has_gui_window INTEGER,
-                is_focused_window INTEGER,
-                window_state TEXT,
-                env_has_display INTEGER,
-                env_has_wayland INTEGER,
-                env_term TEXT,
-                env_ssh INTEGER,
-                is_audio_client INTEGER,
-                has_active_stream INTEGER,
-                process_type TEXT,
-                tags TEXT,
-                nice INTEGER,
-                ionice_class INTEGER,
-                ionice_prio INTEGER,
-                teacher_priority_class TEXT,
-                teacher_score REAL,
-                PRIMARY KEY (snapshot_id, pid)
-            )
-            """
-        )
+        # Подготавливаем данные для вставки
+        snapshot_data: List[tuple] = []
+        process_data: List[tuple] = []
+        app_group_data: List[tuple] = []
         
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS app_groups (
-                snapshot_id INTEGER NOT NULL,
-                app_group_id TEXT NOT NULL,
-                root_pid INTEGER,
-                process_ids TEXT,
-                app_name TEXT,
-                total_cpu_share REAL,
-                total_io_read_bytes INTEGER,
-                total_io_write_bytes INTEGER,
-                total_rss_mb INTEGER,
-                has_gui_window INTEGER,
-                is_focused_group INTEGER,
-                tags TEXT,
-                priority_class TEXT,
-                PRIMARY KEY (snapshot_id, app_group_id)
-            )
-            """
-        )
+        # Ошибки разбора копим и выводим одной сводкой, а не print() на каждую строку
+        skipped_lines = 0
+        skipped_samples: List[str] = []
         
-        # Подготавливаем данные для вставки
-        snapshot_data = []
-        process_data = []
-        app_group_data = []
-        
-        for snapshot_file in tqdm(snapshot_files, desc="Обработка файлов снапшотов"):
-            if snapshot_file.suffix == ".gz":
-                with gzip.open(snapshot_file, 'rt', encoding='utf-8') as f:
-                    lines = f.readlines()
-            else:
-                with open(snapshot_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-            
-            for line in tqdm(lines, desc=f"Обработка {snapshot_file.name}", leave=False):
-                try:
-                    snapshot = _parse_snapshot_line(line)
-                    extracted = _extract_snapshot_data(snapshot)
+        def flush() -> None:
+            _insert_data_batch(cursor, snapshot_data, process_data, app_group_data)
+            snapshot_data.clear()
+            process_data.clear()
+            app_group_data.clear()
+        
+        if decoded is not None:
+            for snapshots, processes, app_groups, file_skipped, file_samples in tqdm(
+                decoded, total=len(files), desc="Обработка файлов снапшотов"
+            ):
+                skipped_lines += file_skipped
+                skipped_samples.extend(file_samples[: 5 - len(skipped_samples)])
+                snapshot_data.extend(snapshots)
+                process_data.extend(processes)
+                app_group_data.extend(app_groups)
+                if len(snapshot_data) >= chunk_size:
+                    flush()
+        else:
+            for snapshot_file in tqdm(files, desc="Обработка файлов снапшотов"):
+                # Читаем файл построчно, не загружая его целиком в память
+                for extracted, error in tqdm(
+                    _iter_snapshot_records(snapshot_file),
+                    desc=f"Обработка {snapshot_file.name}",
+                    unit="lines",
+                    leave=False,
+                ):
+                    if error is not None:
+                        skipped_lines += 1
+                        if len(skipped_samples) < 5:
+                            skipped_samples.append(error)
+                        continue
                     
-                    # Добавляем данные снапшота
                     snapshot_data.append(extracted["snapshot"])
-                    
-                    # Добавляем данные процессов
                     process_data.extend(extracted["processes"])
-                    
-                    # Добавляем данные групп
                     app_group_data.extend(extracted["app_groups"])
                     
                     # Вставляем пакетами для оптимизации
                     if len(snapshot_data) >= chunk_size:
-                        _insert_data_batch(cursor, snapshot_data, process_data, app_group_data)
-                        snapshot_data = []
-                        process_data = []
-                        app_group_data = []
-                        
-                except Exception as e:
-                    print(f"Ошибка при обработке строки: {e}")
-                    continue
+                        flush()
         
         # Вставляем оставшиеся данные
         if snapshot_data:
-            _insert_data_batch(cursor, snapshot_data, process_data, app_group_data)
+            flush()
         
-        conn.commit()
-        conn.close()
+        if skipped_lines:
+            print(
+                f"Пропущено строк с ошибками: {skipped_lines}. Примеры:\n  "
+                + "\n  ".join(skipped_samples)
+            )
+        
+        cursor.execute("COMMIT")
         
     except Exception as e:
-        if conn:
-            conn.close()
+        if conn is not None and conn.in_transaction:
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                # Ошибка отката не должна подменять исходную ошибку загрузки
+                pass
         raise ValueError(f"Ошибка при создании базы данных: {e}") from e
+    finally:
+        if executor is not None:
+            # При ошибке не ждём разбора оставшихся файлов
+            executor.shutdown(cancel_futures=True)
+        if conn is not None:
+            conn.close()
 
 
 def _insert_data_batch(
     cursor: sqlite3.Cursor, 
-    snapshot_data: List[dict], 
-    process_data: List[dict], 
-    app_group_data: List[dict]
+    snapshot_data: List[tuple], 
+    process_data: List[tuple], 
+    app_group_data: List[tuple]
 ) -> None:
     """
     Вставляет пакет данных в базу данных.
     
     Args:
         cursor: Курсор SQLite
-        snapshot_data: Данные снапшотов для вставки
-        process_data: Данные процессов для вставки
-        app_group_data: Данные групп для вставки
+        snapshot_data: Строки снапшотов в порядке _SNAPSHOT_COLUMNS
+        process_data: Строки процессов в порядке _PROCESS_COLUMNS
+        app_group_data: Строки групп в порядке _APP_GROUP_COLUMNS
     """
-    # Вставляем снапшоты
     if snapshot_data:
-        columns = list(snapshot_data[0].keys())
-        placeholders = ", ".join(["?"] * len(columns))
-        cursor.executemany(
-            f"INSERT OR REPLACE INTO snapshots ({', '.join(columns)}) VALUES ({placeholders})",
-            [list(row.values()) for row in snapshot_data]
-        )
+        cursor.executemany(_INSERT_SNAPSHOT_SQL, snapshot_data)
     
-    # Вставляем процессы
     if process_data:
-        columns = list(process_data[0].keys())
-        placeholders = ", ".join(["?"] * len(columns))
-        cursor.executemany(
-            f"INSERT OR REPLACE INTO processes ({', '.join(columns)}) VALUES ({placeholders})",
-            [list(row.values()) for row in process_data]
-        )
+        cursor.executemany(_INSERT_PROCESS_SQL, process_data)
     
-    # Вставляем группы
     if app_group_data:
-        columns = list(app_group_data[0].keys())
-        placeholders = ", ".join(["?"] * len(columns))
-        cursor.executemany(
-            f"INSERT OR REPLACE INTO app_groups ({', '.join(columns)}) VALUES ({placeholders})",
-            [list(row.values()) for row in app_group_data]
-        )
+        cursor.executemany(_INSERT_APP_GROUP_SQL, app_group_data)
 
 
 def collect_data_from_snapshots(
     snapshot_files: Union[Path, Iterable[Path]], 
     output_db: Optional[Path] = None,
-    use_temp_db: bool = True
+    use_temp_db: bool = True,
+    max_workers: Optional[int] = None
 ) -> Path:
     """
     Собирает данные из JSONL файлов снапшотов и создает SQLite базу данных.
@@ -315,6 +575,8 @@ def collect_data_from_snapshots(
         snapshot_files: Путь к файлу снапшота или итератор с путями
         output_db: Путь для сохранения SQLite базы данных
         use_temp_db: Использовать временную базу данных, если output_db не указан
+        max_workers: Число процессов для параллельного разбора файлов
+            (None или 1 - разбор в текущем процессе)
         
     Returns:
         Путь к созданной базе данных
@@ -332,9 +594,16 @@ def collect_data_from_snapshots(
     if not file_list:
         raise ValueError("Не указаны файлы снапшотов")
     
+    # Один stat() на файл: проверяем существование и сразу отбрасываем пустые
+    # файлы, чтобы не открывать их и не запускать gzip-декодер
+    non_empty_files = []
     for file_path in file_list:
-        if not file_path.exists():
-            raise FileNotFoundError(f"Файл снапшота не найден: {file_path}")
+        try:
+            file_size = file_path.stat().st_size
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Файл снапшота не найден: {file_path}") from None
+        if file_size > 0:
+            non_empty_files.append(file_path)
     
     # Определяем путь для базы данных
     if output_db:
@@ -347,7 +616,7 @@ def collect_data_from_snapshots(
     
     try:
         # Создаем базу данных из снапшотов
-        _create_sqlite_from_snapshots(file_list, db_path)
+        _create_sqlite_from_snapshots(non_empty_files, db_path, max_workers=max_workers)
         
         # Проверяем, что база данных создана успешно
         if not db_path.exists():
@@ -391,15 +660,28 @@ def validate_dataset(
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         
-        # Получаем статистику
-        cursor.execute("SELECT COUNT(*) FROM snapshots")
-        snapshot_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM processes")
-        process_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM app_groups")
-        group_count = cursor.fetchone()[0]
+        # Получаем всю статистику одним запросом вместо отдельного запроса на метрику
+        cursor.execute(
+            """
+            SELECT
+                (SELECT COUNT(*) FROM snapshots),
+                (SELECT COUNT(*) FROM processes),
+                (SELECT COUNT(*) FROM app_groups),
+                (SELECT COUNT(DISTINCT pid) FROM processes),
+                (SELECT COUNT(DISTINCT app_group_id) FROM app_groups),
+                (SELECT MIN(timestamp) FROM snapshots),
+                (SELECT MAX(timestamp) FROM snapshots)
+            """
+        )
+        (
+            snapshot_count,
+            process_count,
+            group_count,
+            unique_processes,
+            unique_groups,
+            time_start,
+            time_end,
+        ) = cursor.fetchone()
         
         # Проверяем минимальные требования
         errors = []
@@ -415,16 +697,6 @@ def validate_dataset(
         if errors:
             raise ValueError("Датасет не проходит валидацию: " + "; ".join(errors))
         
-        # Получаем дополнительную статистику
-        cursor.execute("SELECT MIN(timestamp), MAX(timestamp) FROM snapshots")
-        time_range = cursor.fetchone()
-        
-        cursor.execute("SELECT COUNT(DISTINCT pid) FROM processes")
-        unique_processes = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(DISTINCT app_group_id) FROM app_groups")
-        unique_groups = cursor.fetchone()[0]
-        
         conn.close()
         
         return {
@@ -434,8 +706,8 @@ def validate_dataset(
             "unique_processes": unique_processes,
             "unique_groups": unique_groups,
             "time_range": {
-                "start": time_range[0],
-                "end": time_range[1]
+                "start": time_start,
+                "end": time_end
             },
             "validation_passed": True
         }
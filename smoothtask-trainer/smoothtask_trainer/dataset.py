@@ -5,7 +5,7 @@ from __future__ import annotations
 import json
 import sqlite3
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable
 
 import numpy as np
 import pandas as pd
@@ -211,6 +211,61 @@ def _normalize_tags_list(value: str | None, column: str) -> list[str]:
     return normalized
 
 
+def _map_unique(series: pd.Series, func: Callable[[object], list]) -> pd.Series:
+    """
+    Применяет func к каждому уникальному значению столбца один раз.
+
+    JSON-столбцы (tags, process_ids) содержат много повторяющихся строк, поэтому
+    разбор уникальных значений с раскладкой по кодам pd.factorize заметно дешевле
+    поэлементного apply. Каждая строка получает собственную копию списка, так что
+    изменение одной строки не затрагивает остальные. Пропуски (None/NaN)
+    передаются в func как есть, построчно, как при обычном apply.
+
+    Args:
+        series: Исходный столбец
+        func: Функция преобразования одного значения в список
+
+    Returns:
+        Series с результатами func и исходным индексом
+    """
+    try:
+        codes, uniques = pd.factorize(series)
+    except TypeError:
+        # Нехэшируемые значения: обычный поэлементный apply
+        return series.apply(func)
+
+    parsed = [func(value) for value in uniques]
+    values = series.to_numpy(dtype=object)
+    results = [
+        list(parsed[code]) if code >= 0 else func(values[idx])
+        for idx, code in enumerate(codes)
+    ]
+    return pd.Series(results, index=series.index, dtype=object)
+
+
+_BOOL_STRINGS = {"0": False, "1": True, "false": False, "true": True}
+
+
+def _bool_from_scalar(value: object) -> object:
+    """
+    Разбирает одно (не NaN) значение булевого столбца.
+
+    Returns:
+        True/False для допустимых значений, pd.NA для пустой строки и None,
+        если значение недопустимо.
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer, float, np.floating)):
+        return bool(value) if value in (0, 1) else None
+    if isinstance(value, str):
+        stripped = value.strip()
+        if stripped == "":
+            return pd.NA
+        return _BOOL_STRINGS.get(stripped.lower())
+    return None
+
+
 def _coerce_bool_column(
     series: pd.Series, column: str, table: str
 ) -> pd.Series:
@@ -220,54 +275,59 @@ def _coerce_bool_column(
     Допускаются True/False, 0/1, строковые "0"/"1"/"true"/"false" (в любом
     регистре) и NaN. При других значениях выбрасывается ValueError с указанием
     таблицы, списка допустимых значений и примеров некорректных.
+
+    Числовые и булевые столбцы проверяются векторно. Для object-столбцов
+    разбираются только уникальные значения (pd.factorize), результат
+    раскладывается по кодам.
     """
-    coerced: list[object] = []
-    invalid_values: list[object] = []
     allowed_hint = "true/false, 0/1, строки \"true\"/\"false\", NaN"
 
-    for value in series:
-        if pd.isna(value):
-            coerced.append(pd.NA)
-            continue
-        if isinstance(value, (bool, np.bool_)):
-            coerced.append(bool(value))
-            continue
-        if isinstance(value, (int, np.integer)):
-            if value in (0, 1):
-                coerced.append(bool(value))
-                continue
-        if isinstance(value, (float, np.floating)):
-            if value in (0.0, 1.0):
-                coerced.append(bool(int(value)))
-                continue
-        if isinstance(value, str):
-            stripped = value.strip()
-            if stripped == "":
-                coerced.append(pd.NA)
-                continue
-            lowered = stripped.lower()
-            if lowered in {"0", "1", "true", "false"}:
-                coerced.append(lowered in {"1", "true"})
-                continue
-        invalid_values.append(value)
-        coerced.append(pd.NA)
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return series.astype("boolean")
+
+    na_mask = series.isna().to_numpy()
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        invalid_mask = ~(na_mask | series.isin([0, 1]).to_numpy())
+        data = series.eq(1).to_numpy(dtype=bool, na_value=False)
+        missing = na_mask
+    else:
+        # Разбираем только уникальные значения и раскладываем результат по кодам
+        non_na = series[~na_mask]
+        try:
+            codes, uniques = pd.factorize(non_na)
+        except TypeError:
+            # Нехэшируемые значения (списки и т.п.) разбираем поэлементно
+            codes, uniques = np.arange(len(non_na)), non_na.to_numpy()
+        parsed = [_bool_from_scalar(value) for value in uniques]
+        unique_invalid = np.array([p is None for p in parsed], dtype=bool)
+        unique_true = np.array([p is True for p in parsed], dtype=bool)
+        unique_missing = np.array([p is None or p is pd.NA for p in parsed], dtype=bool)
+
+        invalid_mask = np.zeros(len(series), dtype=bool)
+        invalid_mask[~na_mask] = unique_invalid[codes]
+        data = np.zeros(len(series), dtype=bool)
+        data[~na_mask] = unique_true[codes]
+        missing = na_mask.copy()
+        missing[~na_mask] = unique_missing[codes]
 
-    if invalid_values:
-        sample_values = ", ".join(repr(v) for v in invalid_values[:5])
+    if invalid_mask.any():
+        invalid_values = series[invalid_mask].head(5).tolist()
+        sample_values = ", ".join(repr(v) for v in invalid_values)
         raise ValueError(
             f"Колонка '{column}' в таблице '{table}' содержит невалидные булевые значения "
             f"(допустимо: {allowed_hint}): {sample_values}"
         )
 
-    return pd.Series(coerced, index=series.index, dtype="boolean")
+    # Собираем BooleanArray напрямую из значений и маски пропусков
+    return pd.Series(pd.arrays.BooleanArray(data, missing), index=series.index)
 
 
 def _to_bool(df: pd.DataFrame, columns: Iterable[str], table: str) -> None:
     """
-    Преобразует указанные столбцы DataFrame в булевый тип.
+    Преобразует указанные столбцы DataFrame в nullable boolean.
 
-    Преобразование выполняется через промежуточный тип Int64 для корректной
-    обработки NaN значений.
+    Столбцы, уже имеющие dtype ``boolean``, не переписываются. Остальные
+    заменяются результатом _coerce_bool_column без промежуточных копий.
 
     Args:
         df: DataFrame для преобразования (изменяется in-place)
@@ -275,10 +335,9 @@ def _to_bool(df: pd.DataFrame, columns: Iterable[str], table: str) -> None:
         table: Имя таблицы для сообщений об ошибке
     """
     for col in columns:
-        if col in df.columns:
-            df[col] = _coerce_bool_column(
-                pd.Series(df[col], copy=False), column=col, table=table
-            )
+        if col not in df.columns or df[col].dtype == "boolean":
+            continue
+        df[col] = _coerce_bool_column(df[col], column=col, table=table)
 
 
 def _load_table(
@@ -753,15 +812,15 @@ def load_snapshots_as_frame(db_path: Path | str) -> pd.DataFrame:
     _to_bool(app_groups, _APP_GROUP_BOOL_COLS, table="app_groups")
 
     if "tags" in processes.columns:
-        processes["tags"] = processes["tags"].apply(
-            lambda value: _normalize_tags_list(value, column="tags")
+        processes["tags"] = _map_unique(
+            processes["tags"], lambda value: _normalize_tags_list(value, column="tags")
         )
     if "tags" in app_groups.columns:
-        app_groups["tags"] = app_groups["tags"].apply(
-            lambda value: _normalize_tags_list(value, column="tags")
+        app_groups["tags"] = _map_unique(
+            app_groups["tags"], lambda value: _normalize_tags_list(value, column="tags")
         )
     if "process_ids" in app_groups.columns:
-        app_groups["process_ids"] = app_groups["process_ids"].apply(_parse_process_ids)
+        app_groups["process_ids"] = _map_unique(app_groups["process_ids"], _parse_process_ids)
 
         if not app_groups.empty:
             process_index = processes[["snapshot_id", "pid"]].dropna(subset=["snapshot_id", "pid"])
@@ -789,23 +848,25 @@ def load_snapshots_as_frame(db_path: Path | str) -> pd.DataFrame:
                     f"{formatted}"
                 )
 
-    df = processes.merge(
-        snapshots,
+    # Сортируем узкую таблицу процессов до джойнов: left join по индексу правой
+    # таблицы сохраняет порядок строк, и широкий итоговый DataFrame не пересортируется
+    df = processes.sort_values(["snapshot_id", "pid"]).reset_index(drop=True)
+    df = df.join(
+        snapshots.set_index("snapshot_id"),
         on="snapshot_id",
         how="left",
-        suffixes=("_proc", "_snap"),
+        lsuffix="_proc",
+        rsuffix="_snap",
     )
 
     if not app_groups.empty:
-        df = df.merge(
-            app_groups,
+        df = df.join(
+            app_groups.set_index(["snapshot_id", "app_group_id"]),
             on=["snapshot_id", "app_group_id"],
             how="left",
-            suffixes=("", "_group"),
+            rsuffix="_group",
         )
 
-    df = df.sort_values(["snapshot_id", "pid"]).reset_index(drop=True)
-
     return df
 
 
@@ -1,12 +1,18 @@
 """Экспорт обученной модели в различные форматы."""
 
 import json
+import os
+import re
 import time
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Set
 
 from catboost import CatBoostRanker
 
+# Шаблон имени версионного файла модели: model_{version_id}.{format}
+_MODEL_FILENAME_RE = re.compile(r'model_(.+?)\.(onnx|json|cbm)$')
+_MODEL_FORMAT_ORDER = {"onnx": 0, "json": 1, "cbm": 2}
+
 
 def export_model(
     model_path: Path,
@@ -334,32 +340,31 @@ def create_version_manifest(
     if manifest_path is None:
         manifest_path = versions_dir / "versions.json"
     
-    # Собираем информацию о версиях
+    # Собираем информацию о версиях за один проход по директории
     versions = []
+    # os.scandir отдаёт тип записи из readdir, без отдельного stat() на файл
+    with os.scandir(versions_dir) as it:
+        entries = list(it)
+    known_names = {entry.name for entry in entries}
     
-    for model_file in versions_dir.glob("model_*.onnx"):
-        if model_file.is_file():
-            version_info = _extract_version_info_from_filename(model_file)
-            if version_info:
-                versions.append(version_info)
-    
-    for model_file in versions_dir.glob("model_*.json"):
-        if model_file.is_file():
-            version_info = _extract_version_info_from_filename(model_file)
-            if version_info:
-                versions.append(version_info)
-    
-    for model_file in versions_dir.glob("model_*.cbm"):
-        if model_file.is_file():
-            version_info = _extract_version_info_from_filename(model_file)
-            if version_info:
-                versions.append(version_info)
+    for entry in entries:
+        if not _MODEL_FILENAME_RE.match(entry.name) or not entry.is_file():
+            continue
+        try:
+            file_size = entry.stat().st_size
+        except OSError:
+            file_size = None
+        version_info = _extract_version_info_from_filename(
+            versions_dir / entry.name, known_names, file_size
+        )
+        if version_info:
+            versions.append(version_info)
     
     if not versions:
         raise ValueError(f"В директории {versions_dir} не найдено моделей с шаблоном model_*")
     
-    # Сортируем версии по идентификатору
-    versions.sort(key=lambda x: x['version_id'])
+    # Сортируем версии по идентификатору (внутри версии: onnx, json, cbm)
+    versions.sort(key=lambda x: (x['version_id'], _MODEL_FORMAT_ORDER[x['format']]))
     
     # Сохраняем манифест
     with open(manifest_path, 'w', encoding='utf-8') as f:
@@ -367,12 +372,20 @@ def create_version_manifest(
     
     return manifest_path
 
-def _extract_version_info_from_filename(model_file: Path) -> Optional[Dict[str, Any]]:
+def _extract_version_info_from_filename(
+    model_file: Path,
+    known_names: Optional[Set[str]] = None,
+    file_size: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
     """
     Извлекает информацию о версии из имени файла модели.
 
     Args:
         model_file: путь к файлу модели
+        known_names: имена файлов в директории модели; если указаны, наличие
+            метаданных проверяется по ним без лишних обращений к файловой системе
+        file_size: уже известный размер файла модели; если не указан,
+            определяется через stat()
 
     Returns:
         Словарь с информацией о версии или None, если формат не распознан
@@ -380,9 +393,7 @@ def _extract_version_info_from_filename(model_file: Path) -> Optional[Dict[str,
     filename = model_file.name
     
     # Пробуем извлечь версию из шаблона model_{version_id}.{format}
-    import re
-    pattern = r'model_(.+?)\.(onnx|json|cbm)$'
-    match = re.match(pattern, filename)
+    match = _MODEL_FILENAME_RE.match(filename)
     
     if not match:
         return None
@@ -397,7 +408,12 @@ def _extract_version_info_from_filename(model_file: Path) -> Optional[Dict[str,
     else:
         metadata_path = model_file.with_suffix('.metadata.json')
     
-    if metadata_path.exists():
+    if known_names is None:
+        has_metadata = metadata_path.exists()
+    else:
+        has_metadata = metadata_path.name in known_names
+
+    if has_metadata:
         try:
             with open(metadata_path, 'r', encoding='utf-8') as f:
                 metadata = json.load(f)
@@ -418,9 +434,12 @@ def _extract_version_info_from_filename(model_file: Path) -> Optional[Dict[str,
         version_info['model_hash'] = metadata['model_hash']
     
     # Добавляем размер файла
-    try:
-        version_info['file_size'] = model_file.stat().st_size
-    except Exception:
-        pass
+    if file_size is not None:
+        version_info['file_size'] = file_size
+    else:
+        try:
+            version_info['file_size'] = model_file.stat().st_size
+        except Exception:
+            pass
     
     return version_info
@@ -34,7 +34,8 @@ class TrainingPipeline:
         use_temp_db: bool = True,
         min_snapshots: int = 1,
         min_processes: int = 10,
-        min_groups: int = 1
+        min_groups: int = 1,
+        max_workers: Optional[int] = None
     ):
         """
         Инициализирует pipeline.
@@ -46,6 +47,8 @@ class TrainingPipeline:
             min_snapshots: Минимальное количество снапшотов для валидации
             min_processes: Минимальное количество процессов для валидации
             min_groups: Минимальное количество групп для валидации
+            max_workers: Число процессов для параллельного разбора файлов снапшотов
+                (None или 1 - разбор в текущем процессе)
         """
         self.snapshot_files = snapshot_files
         self.db_path = db_path
@@ -53,6 +56,7 @@ class TrainingPipeline:
         self.min_snapshots = min_snapshots
         self.min_processes = min_processes
         self.min_groups = min_groups
+        self.max_workers = max_workers
         self._db_path: Optional[Path] = None
         self._dataset: Optional[pd.DataFrame] = None
         self._model: Optional[CatBoostRanker] = None
@@ -76,7 +80,8 @@ class TrainingPipeline:
             # Собираем данные из снапшотов
             self._db_path = collect_data_from_snapshots(
                 self.snapshot_files, 
-                use_temp_db=self.use_temp_db
+                use_temp_db=self.use_temp_db,
+                max_workers=self.max_workers
             )
         else:
             raise ValueError("Не указаны ни snapshot_files, ни db_path")
@@ -266,6 +271,7 @@ def train_from_snapshots(
     min_snapshots: int = 1,
     min_processes: int = 10,
     min_groups: int = 1,
+    max_workers: Optional[int] = None,
     **train_params
 ) -> CatBoostRanker:
     """
@@ -279,6 +285,7 @@ def train_from_snapshots(
         min_snapshots: Минимальное количество снапшотов для валидации
         min_processes: Минимальное количество процессов для валидации
         min_groups: Минимальное количество групп для валидации
+        max_workers: Число процессов для параллельного разбора файлов снапшотов
         **train_params: Дополнительные параметры для обучения
         
     Returns:
@@ -292,7 +299,8 @@ def train_from_snapshots(
         use_temp_db=use_temp_db,
         min_snapshots=min_snapshots,
         min_processes=min_processes,
-        min_groups=min_groups
+        min_groups=min_groups,
+        max_workers=max_workers
     )
     
     return pipeline.run_complete_pipeline(model_path, onnx_path, **train_params)
@@ -396,6 +404,12 @@ if __name__ == "__main__":
         help="Минимальное количество групп для валидации"
     )
     
+    parser.add_argument(
+        "--workers", 
+        type=int,
+        help="Число процессов для параллельного разбора файлов снапшотов"
+    )
+    
     args = parser.parse_args()
     
     if args.snapshots and args.db:
@@ -412,7 +426,8 @@ if __name__ == "__main__":
             use_temp_db=args.use_temp_db,
             min_snapshots=args.min_snapshots,
             min_processes=args.min_processes,
-            min_groups=args.min_groups
+            min_groups=args.min_groups,
+            max_workers=args.workers
         )
     else:
         train_from_database(
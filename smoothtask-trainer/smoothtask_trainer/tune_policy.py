@@ -1,6 +1,9 @@
 """Оффлайн-тюнинг параметров политики по логам и метрикам латентности."""
 
+import os
+import shutil
 import sqlite3
+import uuid
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, Optional
@@ -591,8 +594,7 @@ def save_optimized_config(
         if not config_in.exists():
             raise FileNotFoundError(f"Исходный конфиг не найден: {config_in}")
 
-        with open(config_in, "r") as f:
-            base_config = yaml.safe_load(f) or {}
+        base_config = yaml.safe_load(config_in.read_text(encoding="utf-8")) or {}
 
     # Объединяем исходный конфиг с оптимизированными параметрами
     # Оптимизированные параметры имеют приоритет над исходными
@@ -615,14 +617,34 @@ def save_optimized_config(
 
     merged_config = deep_update(merged_config, config_dict)
 
-    # Сохраняем объединённый конфиг в YAML файл
+    # Сохраняем объединённый конфиг в YAML файл атомарно: пишем во временный
+    # файл в той же директории и подменяем им config_out через os.replace,
+    # чтобы при сбое не остался наполовину записанный конфиг.
+    # Симлинк разыменовываем, чтобы заменить файл, на который он указывает,
+    # а не сам симлинк.
+    config_text = yaml.dump(merged_config, default_flow_style=False, sort_keys=False)
+    target_path = Path(os.path.realpath(config_out))
+    tmp_path: Optional[Path] = None
     try:
-        with open(config_out, "w") as f:
-            yaml.dump(merged_config, f, default_flow_style=False, sort_keys=False)
+        # Временный файл создаём через os.open с правами 0666: ядро применит
+        # umask, как для обычного open() (mkstemp дал бы 0600). Для
+        # существующего конфига затем переносим его права.
+        tmp_name = target_path.with_name(f".{target_path.name}.{uuid.uuid4().hex}.tmp")
+        fd = os.open(tmp_name, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+        tmp_path = tmp_name
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(config_text)
+        if target_path.exists():
+            shutil.copymode(target_path, tmp_path)
+        os.replace(tmp_path, target_path)
+        tmp_path = None
     except IOError as e:
         raise IOError(f"Не удалось записать конфиг в {config_out}: {e}") from e
     except PermissionError as e:
         raise PermissionError(f"Нет прав на запись в {config_out}: {e}") from e
+    finally:
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
 
 
 def tune_policy(
@@ -4,11 +4,19 @@ import gzip
 import json
 import sqlite3
 import tempfile
+from concurrent.futures import Future
 from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
 from smoothtask_trainer.collect_data import (
+    _APP_GROUP_COLUMNS,
+    _PROCESS_COLUMNS,
+    _SNAPSHOT_COLUMNS,
+    _create_sqlite_from_snapshots,
+    _decode_files_in_pool,
+    _extract_snapshot_data,
+    _parse_snapshot_line,
     collect_data_from_snapshots,
     load_dataset,
     validate_dataset,
@@ -241,6 +249,285 @@ def test_collect_data_from_multiple_snapshots():
         db_path.unlink()
 
 
+def test_collect_data_with_process_pool(capsys):
+    """Тест параллельного разбора файлов снапшотов в пуле процессов."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        snapshot_file1 = Path(tmpdir) / "test_snapshots1.jsonl"
+        snapshot_file2 = Path(tmpdir) / "test_snapshots2.jsonl.gz"
+        output_db = Path(tmpdir) / "output.db"
+
+        create_test_snapshot_file(snapshot_file1, num_snapshots=2, base_snapshot_id=1000)
+        with open(snapshot_file1, "a", encoding="utf-8") as f:
+            f.write("{not json\n")
+        plain_file = Path(tmpdir) / "plain.jsonl"
+        create_test_snapshot_file(
+            plain_file, num_snapshots=3, base_snapshot_id=2000, processes_per_snapshot=2
+        )
+        with gzip.open(snapshot_file2, "wb") as f:
+            f.write(plain_file.read_bytes())
+
+        collect_data_from_snapshots(
+            [snapshot_file1, snapshot_file2], output_db=output_db, max_workers=2
+        )
+
+        conn = sqlite3.connect(output_db)
+        snapshot_count = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        process_count = conn.execute("SELECT COUNT(*) FROM processes").fetchone()[0]
+        conn.close()
+        assert snapshot_count == 5
+        assert process_count == 2 + 3 * 2
+        assert "Пропущено строк с ошибками: 1" in capsys.readouterr().out
+
+
+def test_collect_data_skips_empty_snapshot_files():
+    """Тест сбора данных при наличии пустых файлов снапшотов."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        snapshot_file = Path(tmpdir) / "test_snapshots.jsonl"
+        empty_file = Path(tmpdir) / "empty_snapshots.jsonl"
+        empty_gz_file = Path(tmpdir) / "empty_snapshots.jsonl.gz"
+        output_db = Path(tmpdir) / "output.db"
+
+        create_test_snapshot_file(snapshot_file, num_snapshots=2)
+        empty_file.touch()
+        empty_gz_file.touch()
+
+        collect_data_from_snapshots([empty_file, snapshot_file, empty_gz_file], output_db=output_db)
+
+        conn = sqlite3.connect(output_db)
+        snapshot_count = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        conn.close()
+        assert snapshot_count == 2, f"Ожидалось 2 снапшота, получено {snapshot_count}"
+
+
+def test_collect_data_reports_invalid_lines_once(capsys):
+    """Тест сводного вывода ошибок разбора строк снапшотов."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        snapshot_file = Path(tmpdir) / "test_snapshots.jsonl"
+        output_db = Path(tmpdir) / "output.db"
+
+        create_test_snapshot_file(snapshot_file, num_snapshots=2)
+        with open(snapshot_file, "a", encoding="utf-8") as f:
+            f.write("{not json\n" * 3)
+
+        collect_data_from_snapshots(snapshot_file, output_db=output_db)
+
+        output = capsys.readouterr().out
+        assert output.count("Пропущено строк с ошибками: 3") == 1
+
+        conn = sqlite3.connect(output_db)
+        snapshot_count = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        conn.close()
+        assert snapshot_count == 2
+
+
+def test_decode_files_in_pool_limits_in_flight_tasks():
+    """Тест скользящего окна: в пуле не больше window задач, порядок сохраняется."""
+
+    class RecordingExecutor:
+        def __init__(self):
+            self.submitted = []
+
+        def submit(self, fn, snapshot_file):
+            self.submitted.append(snapshot_file)
+            future = Future()
+            future.set_result(snapshot_file)
+            return future
+
+    executor = RecordingExecutor()
+    files = [Path(f"snapshots{i}.jsonl") for i in range(5)]
+
+    results = _decode_files_in_pool(executor, files, 2)
+    # Первые задачи отправляются сразу, до первой итерации
+    assert executor.submitted == files[:2]
+
+    consumed = []
+    for result in results:
+        consumed.append(result)
+        assert len(executor.submitted) - len(consumed) <= 2
+    assert consumed == files
+
+
+def test_parse_snapshot_line():
+    """Тест разбора строки снапшота и ошибки на некорректном JSON."""
+    assert _parse_snapshot_line('{"snapshot_id": 1, "tags": ["ё"]}\n') == {
+        "snapshot_id": 1,
+        "tags": ["ё"],
+    }
+
+    with pytest.raises(ValueError, match="Некорректный JSON"):
+        _parse_snapshot_line("{not json\n")
+
+
+def test_extract_snapshot_data_does_not_mutate_snapshot():
+    """Тест разбора снапшота без изменения исходного словаря."""
+    snapshot = {
+        "snapshot_id": 7,
+        "timestamp": "2024-01-01T00:00:00+00:00",
+        "cpu_user": 0.5,
+        "processes": [{"pid": 1, "tags": ["a"]}],
+        "app_groups": [{"app_group_id": "g", "process_ids": [1]}],
+    }
+
+    extracted = _extract_snapshot_data(snapshot)
+
+    snapshot_row = dict(zip(_SNAPSHOT_COLUMNS, extracted["snapshot"]))
+    assert snapshot_row["snapshot_id"] == 7
+    assert snapshot_row["timestamp"] == "2024-01-01T00:00:00+00:00"
+    assert snapshot_row["cpu_user"] == 0.5
+    assert snapshot_row["cpu_system"] is None
+
+    assert len(extracted["processes"]) == 1
+    process_row = dict(zip(_PROCESS_COLUMNS, extracted["processes"][0]))
+    assert process_row["snapshot_id"] == 7
+    assert process_row["pid"] == 1
+    assert process_row["tags"] == '["a"]'
+
+    assert len(extracted["app_groups"]) == 1
+    group_row = dict(zip(_APP_GROUP_COLUMNS, extracted["app_groups"][0]))
+    assert group_row["snapshot_id"] == 7
+    assert group_row["app_group_id"] == "g"
+    assert group_row["process_ids"] == "[1]"
+    assert "processes" in snapshot and "app_groups" in snapshot
+
+
+def test_insert_columns_match_schema():
+    """Тест соответствия списков столбцов для вставки схеме таблиц."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        snapshot_file = Path(tmpdir) / "test_snapshots.jsonl"
+        output_db = Path(tmpdir) / "output.db"
+        create_test_snapshot_file(snapshot_file, num_snapshots=1)
+
+        collect_data_from_snapshots(snapshot_file, output_db=output_db)
+
+        conn = sqlite3.connect(output_db)
+        for table, columns in (
+            ("snapshots", _SNAPSHOT_COLUMNS),
+            ("processes", _PROCESS_COLUMNS),
+            ("app_groups", _APP_GROUP_COLUMNS),
+        ):
+            schema = tuple(row[1] for row in conn.execute(f"PRAGMA table_info({table})"))
+            assert schema == columns, f"Столбцы {table} расходятся со схемой"
+        conn.close()
+
+
+def test_collect_data_tolerates_missing_and_unknown_fields():
+    """Тест вставки снапшотов с отсутствующими и незнакомыми полями."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        snapshot_file = Path(tmpdir) / "test_snapshots.jsonl"
+        output_db = Path(tmpdir) / "output.db"
+        snapshots = [
+            {"snapshot_id": 1, "timestamp": "2024-01-01T00:00:00+00:00", "cpu_user": 0.1},
+            {
+                "snapshot_id": 2,
+                "timestamp": "2024-01-01T00:00:01+00:00",
+                "cpu_system": 0.2,
+                "unknown_metric": 42,
+                "processes": [{"pid": 10, "exe": "/usr/bin/a"}],
+            },
+        ]
+        snapshot_file.write_text(
+            "".join(json.dumps(snapshot) + "\n" for snapshot in snapshots), encoding="utf-8"
+        )
+
+        collect_data_from_snapshots(snapshot_file, output_db=output_db)
+
+        conn = sqlite3.connect(output_db)
+        rows = conn.execute(
+            "SELECT snapshot_id, cpu_user, cpu_system FROM snapshots ORDER BY snapshot_id"
+        ).fetchall()
+        process = conn.execute("SELECT snapshot_id, pid, exe, ppid FROM processes").fetchone()
+        conn.close()
+        assert rows == [(1, 0.1, None), (2, None, 0.2)]
+        assert process == (2, 10, "/usr/bin/a", None)
+
+
+def test_collect_data_accepts_nan_and_infinity():
+    """Тест загрузки строк с NaN/Infinity, которые пишет json.dumps."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        snapshot_file = Path(tmpdir) / "test_snapshots.jsonl"
+        output_db = Path(tmpdir) / "output.db"
+        snapshot = {
+            "snapshot_id": 1,
+            "timestamp": "2024-01-01T00:00:00+00:00",
+            "cpu_user": float("nan"),
+            "cpu_system": float("inf"),
+        }
+        snapshot_file.write_text(json.dumps(snapshot) + "\n", encoding="utf-8")
+
+        collect_data_from_snapshots(snapshot_file, output_db=output_db)
+
+        conn = sqlite3.connect(output_db)
+        rows = conn.execute("SELECT snapshot_id, cpu_user, cpu_system FROM snapshots").fetchall()
+        conn.close()
+        # SQLite хранит NaN как NULL
+        assert rows == [(1, None, float("inf"))]
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_create_sqlite_rolls_back_on_insert_error(max_workers):
+    """Тест отката транзакции, если пакет не удалось вставить."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        snapshot_file = Path(tmpdir) / "test_snapshots.jsonl"
+        db_path = Path(tmpdir) / "output.db"
+        snapshot_file.write_text(
+            json.dumps({"snapshot_id": 1, "timestamp": "t"}) + "\n"
+            + json.dumps({"snapshot_id": 2, "timestamp": "t", "processes": [{"pid": {"bad": 1}}]})
+            + "\n",
+            encoding="utf-8",
+        )
+
+        with pytest.raises(ValueError, match="Ошибка при создании базы данных"):
+            _create_sqlite_from_snapshots([snapshot_file], db_path, max_workers=max_workers)
+
+        conn = sqlite3.connect(db_path)
+        snapshot_count = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        conn.close()
+        assert snapshot_count == 0
+
+
+def test_collect_data_keeps_journal_for_existing_db(monkeypatch):
+    """Тест: ослабленные PRAGMA применяются только к новой базе, дозапись сохраняет данные."""
+    real_connect = sqlite3.connect
+    statements = []
+
+    def traced_connect(*args, **kwargs):
+        conn = real_connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(sqlite3, "connect", traced_connect)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_db = Path(tmpdir) / "output.db"
+        snapshot_file1 = Path(tmpdir) / "test_snapshots1.jsonl"
+        snapshot_file2 = Path(tmpdir) / "test_snapshots2.jsonl"
+        create_test_snapshot_file(snapshot_file1, num_snapshots=2, base_snapshot_id=1000)
+        create_test_snapshot_file(snapshot_file2, num_snapshots=3, base_snapshot_id=2000)
+
+        collect_data_from_snapshots(snapshot_file1, output_db=output_db)
+        assert any("synchronous = OFF" in statement for statement in statements)
+
+        statements.clear()
+        collect_data_from_snapshots(snapshot_file2, output_db=output_db)
+        assert not any("synchronous = OFF" in statement for statement in statements)
+        assert not any("journal_mode = MEMORY" in statement for statement in statements)
+
+        conn = real_connect(output_db)
+        snapshot_count = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        conn.close()
+        assert snapshot_count == 5
+
+
+def test_create_sqlite_reports_connect_error():
+    """Тест ошибки открытия базы данных в несуществующей директории."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        snapshot_file = Path(tmpdir) / "test_snapshots.jsonl"
+        create_test_snapshot_file(snapshot_file, num_snapshots=1)
+
+        with pytest.raises(ValueError, match="Ошибка при создании базы данных"):
+            _create_sqlite_from_snapshots([snapshot_file], Path(tmpdir) / "missing" / "out.db")
+
+
 def test_collect_data_with_output_path():
     """Тест сбора данных с указанием выходного пути."""
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -290,6 +577,9 @@ def test_validate_dataset_basic():
         assert stats["snapshot_count"] == 3
         assert stats["process_count"] == 3
         assert stats["group_count"] == 3
+        assert stats["unique_processes"] == 3
+        assert stats["unique_groups"] == 3
+        assert stats["time_range"]["start"] <= stats["time_range"]["end"]
         assert stats["validation_passed"] is True
         
         # Удаляем базу данных
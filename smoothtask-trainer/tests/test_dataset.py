@@ -10,7 +10,14 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 import pytest
-from smoothtask_trainer.dataset import _json_list, _parse_process_ids, _to_bool, load_snapshots_as_frame
+from smoothtask_trainer.dataset import (
+    _json_list,
+    _map_unique,
+    _normalize_tags_list,
+    _parse_process_ids,
+    _to_bool,
+    load_snapshots_as_frame,
+)
 
 
 def create_test_db(db_path: Path) -> None:
@@ -1106,6 +1113,42 @@ def test_json_list_invalid_json_message():
         _json_list("[1, 2")
 
 
+def test_map_unique_parses_each_value_once():
+    """_map_unique вызывает функцию один раз на уникальное значение, None - построчно."""
+    calls: list[object] = []
+
+    def parse(value):
+        calls.append(value)
+        return _parse_process_ids(value)
+
+    series = pd.Series(["[1, 2]", None, "[1, 2]", None, "[3]"], index=[10, 11, 12, 13, 14])
+    result = _map_unique(series, parse)
+
+    assert list(result.index) == [10, 11, 12, 13, 14]
+    assert result.tolist() == [[1, 2], [], [1, 2], [], [3]]
+    assert sorted(calls, key=repr) == sorted(["[1, 2]", "[3]", None, None], key=repr)
+
+
+def test_map_unique_returns_independent_lists():
+    """Изменение списка в одной строке не затрагивает строки с тем же значением."""
+    series = pd.Series(['["a", "b"]', '["a", "b"]', '["a", "b"]'])
+    result = _map_unique(series, lambda value: _normalize_tags_list(value, column="tags"))
+
+    result.iloc[0].append("c")
+
+    assert result.iloc[0] == ["a", "b", "c"]
+    assert result.iloc[1] == ["a", "b"]
+    assert result.iloc[2] == ["a", "b"]
+
+
+def test_map_unique_rejects_float_nan_like_apply():
+    """Float NaN разбирается построчно и, как раньше, считается некорректным значением."""
+    series = pd.Series(["[1]", np.nan], dtype=object)
+
+    with pytest.raises(ValueError, match="Ожидалась JSON-строка"):
+        _map_unique(series, _parse_process_ids)
+
+
 def test_to_bool_converts_present_columns_only():
     """_to_bool конвертирует только существующие колонки, сохраняя NaN."""
     df = pd.DataFrame(
@@ -1140,6 +1183,22 @@ def test_to_bool_no_warnings_for_nullable_bools():
     assert df["flag_bool"].dtype == "boolean"
 
 
+def test_to_bool_mixed_object_column():
+    """_to_bool разбирает смешанные object-столбцы и перечисляет невалидные значения."""
+    df = pd.DataFrame({"flag": ["1", " TRUE ", 0, 1.0, "", None, False]})
+
+    _to_bool(df, ["flag"], table="test_table")
+
+    assert df["flag"].dtype == "boolean"
+    assert list(df["flag"]) == [True, True, False, True, pd.NA, pd.NA, False]
+
+    bad = pd.DataFrame({"flag": ["1", "yes", 2, "yes", 0.5, "1.0", "no"]})
+    with pytest.raises(
+        ValueError, match=r"'flag' в таблице 'test_table'.*'yes', 2, 'yes', 0.5, '1.0'$"
+    ):
+        _to_bool(bad, ["flag"], table="test_table")
+
+
 def test_load_snapshots_as_frame_invalid_boolean_values_raises():
     """Невалидные булевые значения должны выдавать понятный ValueError."""
     with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
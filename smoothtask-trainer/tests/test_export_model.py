@@ -1,12 +1,17 @@
 """Тесты для экспорта моделей."""
 
+import json
 import tempfile
 from pathlib import Path
 
 import numpy as np
 import pytest
 from catboost import CatBoostRanker, Pool
-from smoothtask_trainer.export_model import export_model, validate_exported_model
+from smoothtask_trainer.export_model import (
+    create_version_manifest,
+    export_model,
+    validate_exported_model,
+)
 
 
 def create_test_model(model_path: Path, format: str = "json"):
@@ -396,3 +401,40 @@ def test_export_model_all_formats_with_metadata():
             else:
                 metadata_path = output_path.with_suffix('.metadata.json')
             assert metadata_path.exists()
+
+
+def test_create_version_manifest_orders_versions():
+    """Тест манифеста: сортировка по версии, внутри версии onnx/json/cbm."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        versions_dir = Path(tmpdir)
+        for name in ["model_v2.cbm", "model_v1.cbm", "model_v1.json", "model_v1.onnx", "notes.txt"]:
+            (versions_dir / name).write_bytes(b"stub")
+
+        manifest_path = create_version_manifest(versions_dir)
+        versions = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+        assert [(v["version_id"], v["format"]) for v in versions] == [
+            ("v1", "onnx"),
+            ("v1", "json"),
+            ("v1", "cbm"),
+            ("v2", "cbm"),
+        ]
+        assert all(v["file_size"] == 4 for v in versions)
+
+
+def test_create_version_manifest_reads_metadata():
+    """Тест манифеста: метаданные подхватываются из соседнего файла."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        versions_dir = Path(tmpdir)
+        (versions_dir / "model_v1.onnx").write_bytes(b"stub")
+        (versions_dir / "model_v1.onnx.metadata.json").write_text(
+            json.dumps({"version_timestamp": 123.0, "model_hash": "abc"}), encoding="utf-8"
+        )
+
+        manifest_path = create_version_manifest(versions_dir)
+        versions = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+        onnx_versions = [v for v in versions if v["format"] == "onnx"]
+        assert len(onnx_versions) == 1
+        assert onnx_versions[0]["timestamp"] == 123.0
+        assert onnx_versions[0]["model_hash"] == "abc"
@@ -276,6 +276,28 @@ def test_training_pipeline_step_by_step():
         pipeline.cleanup()
 
 
+def test_training_pipeline_collect_data_with_workers():
+    """Тест сбора данных pipeline с параллельным разбором снапшотов."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        snapshot_file = Path(tmpdir) / "test_snapshots.jsonl"
+        create_test_snapshot_file(snapshot_file, num_snapshots=3)
+        
+        pipeline = TrainingPipeline(
+            snapshot_files=snapshot_file,
+            use_temp_db=True,
+            min_snapshots=1,
+            min_processes=1,
+            min_groups=1,
+            max_workers=2
+        )
+        
+        pipeline.collect_data()
+        stats = pipeline.validate_data()
+        assert stats["snapshot_count"] == 3, "Ожидалось 3 снапшота"
+        
+        pipeline.cleanup()
+
+
 def test_training_pipeline_error_handling():
     """Тест обработки ошибок в pipeline."""
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -1,6 +1,7 @@
 """Тесты для тюнинга параметров политики."""
 
 import sqlite3
+import stat
 import warnings
 import tempfile
 from datetime import datetime, timezone
@@ -1089,6 +1090,74 @@ def test_save_optimized_config_with_base_config():
             assert config["thresholds"]["noisy_neighbour_cpu_share"] == 0.7
 
 
+def test_save_optimized_config_reads_utf8_base_config():
+    """Тест чтения базового конфига в UTF-8 (комментарии и значения на кириллице)."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base_config_path = Path(tmpdir) / "base_config.yml"
+        optimized_config_path = Path(tmpdir) / "optimized_config.yml"
+
+        base_config_path.write_text(
+            "# Конфигурация SmoothTask\n"
+            "policy_mode: rules-only\n"
+            "description: Рабочая станция\n",
+            encoding="utf-8",
+        )
+
+        save_optimized_config(
+            {"thresholds": {"psi_cpu_some_high": 0.7}},
+            optimized_config_path,
+            config_in=base_config_path,
+        )
+
+        config = yaml.safe_load(optimized_config_path.read_text(encoding="utf-8"))
+        assert config["description"] == "Рабочая станция"
+        assert config["thresholds"]["psi_cpu_some_high"] == 0.7
+
+
+def test_save_optimized_config_overwrites_in_place():
+    """Тест атомарной перезаписи конфига без временных файлов в директории."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config_path = Path(tmpdir) / "config.yml"
+        config_path.write_text("policy_mode: rules-only\n", encoding="utf-8")
+
+        save_optimized_config(
+            {"thresholds": {"psi_cpu_some_high": 0.7}},
+            config_path,
+            config_in=config_path,
+        )
+
+        config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
+        assert config["policy_mode"] == "rules-only"
+        assert config["thresholds"]["psi_cpu_some_high"] == 0.7
+        assert [p.name for p in Path(tmpdir).iterdir()] == ["config.yml"]
+
+
+def test_save_optimized_config_preserves_mode_and_symlink():
+    """Тест сохранения прав доступа и симлинка при перезаписи конфига."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config_path = Path(tmpdir) / "config.yml"
+        config_path.write_text("policy_mode: rules-only\n", encoding="utf-8")
+        config_path.chmod(0o644)
+        link_path = Path(tmpdir) / "link.yml"
+        link_path.symlink_to(config_path)
+
+        save_optimized_config({"thresholds": {"psi_cpu_some_high": 0.7}}, link_path)
+
+        assert link_path.is_symlink()
+        assert stat.S_IMODE(config_path.stat().st_mode) == 0o644
+        config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
+        assert config["thresholds"]["psi_cpu_some_high"] == 0.7
+
+        # Новый файл получает те же права, что и файл, созданный обычным open()
+        new_path = Path(tmpdir) / "new.yml"
+        save_optimized_config({"policy_mode": "hybrid"}, new_path)
+        reference_path = Path(tmpdir) / "reference.yml"
+        reference_path.write_text("", encoding="utf-8")
+        assert stat.S_IMODE(new_path.stat().st_mode) == stat.S_IMODE(
+            reference_path.stat().st_mode
+        )
+
+
 def test_save_optimized_config_with_nonexistent_base():
     """Тест сохранения оптимизированного конфига с несуществующим базовым конфигом."""
     with tempfile.TemporaryDirectory() as tmpdir: